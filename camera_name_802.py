@@ -2,7 +2,7 @@ import csv
 import os
 import time
 from playwright.sync_api import sync_playwright
-from common import get_camera_credentials, get_eap_credentials, resolve_inventory_path, validate_csv
+from common import get_camera_credentials, get_eap_credentials, resolve_inventory_path, validate_csv, try_login
 
 # --- Get credentials from .env ---
 USERNAME, PASSWORD = get_camera_credentials()
@@ -13,40 +13,6 @@ EAP_METHOD = "peap"
 CONFIG_NAME = "WIRED-MSCHAPv2"
 READ_COMMUNITY = "RNPS"
 
-# --- Login handler for all camera UIs ---
-def try_login(page, ip):
-    try:
-        # Legacy form login
-        page.wait_for_selector("#input-username", timeout=3000)
-        page.fill("#input-username", USERNAME)
-        page.fill("#input-password", PASSWORD)
-        page.click("#btn-signin")
-        print(" → Form-based login succeeded.")
-        page.wait_for_timeout(2000)
-        return
-    except:
-        pass
-
-    try:
-        # WebUI Next (React/Material UI)
-        page.wait_for_selector("#textfield_username", timeout=5000)
-        page.fill("#textfield_username", USERNAME)
-        page.fill("#textfield_password", PASSWORD)
-        page.get_by_role("button", name="Sign in", exact=True).click()
-        page.wait_for_timeout(3000)
-        
-        # Check if login failed
-        if page.locator("#textfield_username").is_visible(timeout=2000):
-            print(f" → WebUI Next login FAILED - wrong credentials on {ip}")
-            raise Exception("Authentication failed")
-        
-        print(" → WebUI Next login succeeded.")
-        return
-    except Exception as e:
-        if "Authentication failed" in str(e):
-            raise
-        print(f" → No login form found on {ip} — assuming HTTP Basic Auth handled it.")
-
 # --- Prompt for school ---
 school = input("Select a school number in format - 001, 016 etc.: ").strip()
 
@@ -83,8 +49,7 @@ with open(csv_path, newline='', encoding='utf-8-sig') as csvfile:
 
             try:
                 # --- LOGIN (mixed) ---
-                page.goto(f"http://{ip}")
-                try_login(page, ip)
+                try_login(page, ip, USERNAME, PASSWORD)
                 successful_logins += 1
 
                 # --- HOSTNAME CONFIG ---
@@ -2,6 +2,8 @@
 from __future__ import annotations
 import os
 import pathlib
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 # Load .env file if it exists (searches current dir, then project root, then home dir)
@@ -98,6 +100,23 @@ def get_eap_credentials() -> tuple[str | None, str | None]:
     return os.getenv("EAP_IDENTITY"), os.getenv("EAP_PASSWORD")
 
 
+def camera_auth_headers(username: str, password: str) -> dict[str, str]:
+    """
+    Build HTTP Basic Auth headers for direct (non-browser) camera requests.
+
+    Args:
+        username: Camera username
+        password: Camera password
+
+    Returns:
+        Header dict suitable for http.client requests
+    """
+    import base64
+
+    token = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+
 def validate_csv(csv_path: str, required_headers: list[str] = None) -> None:
     """
     Validate CSV file for encoding issues and required headers.
@@ -175,3 +194,236 @@ def validate_csv(csv_path: str, required_headers: list[str] = None) -> None:
         exit(1)
     
     print(f"✓ CSV validation passed: {os.path.basename(csv_path)}")
+
+
+# --------------------------------------------------------------------
+# LOGIN ENGINE
+# The legacy form, the WebUI Next form and the authenticated about page
+# are raced in a single wait, and HTTP Basic Auth is recognised from a
+# direct probe, so login latency is one page load instead of a chain of
+# per-UI timeouts:
+# 1. Legacy HTML login form
+# 2. WebUI Next / Material UI React login
+# 3. Authenticated landing page (existing session or unprotected camera)
+# 4. HTTP Basic Auth (context http_credentials answer the challenge)
+# --------------------------------------------------------------------
+LEGACY_LOGIN_SELECTOR = "#input-username"
+WEBUI_NEXT_LOGIN_SELECTOR = "#textfield_username"
+
+# inventory_cameras.py reads the part number from this page after login;
+# the field is only populated for an authenticated session
+LANDING_PATH = "/web/about.shtml"
+AUTHENTICATED_SELECTOR = "#text-partNumber:not(:empty)"
+
+LOGIN_TIMEOUT_MS = 10000
+
+
+class LoginError(Exception):
+    """Raised when a camera rejects the configured credentials."""
+
+
+def basic_auth_challenge(ip: str, path: str = LANDING_PATH, timeout: int = 5) -> bool:
+    """
+    Check whether the camera protects its pages with HTTP Basic Auth.
+
+    Args:
+        ip: Camera IP address (optionally with :port)
+        path: Page to request without credentials
+        timeout: Socket timeout in seconds
+
+    Returns:
+        True if the unauthenticated request is answered with a Basic challenge
+    """
+    import http.client
+
+    conn = http.client.HTTPConnection(ip, timeout=timeout)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        challenge = response.getheader("WWW-Authenticate", "") or ""
+        return response.status == 401 and challenge.lower().startswith("basic")
+    finally:
+        conn.close()
+
+
+def _is_login_request(request, ip: str, username: str) -> bool:
+    """Match the sign-in POST itself, not keepalive or telemetry calls from the page."""
+    from urllib.parse import quote_plus, urlparse
+
+    if request.method != "POST" or urlparse(request.url).netloc != ip:
+        return False
+    try:
+        body = request.post_data or ""
+    except Exception:
+        return False
+    return username in body or quote_plus(username) in body
+
+
+def _matches(element, selector: str) -> bool:
+    return element.evaluate("(el, selector) => el.matches(selector)", selector)
+
+
+def try_login(page, ip: str, username: str, password: str,
+              timeout: int = LOGIN_TIMEOUT_MS) -> str:
+    """
+    Open the camera web UI and log in with whichever method it presents.
+
+    Success is always confirmed by a positive signal:
+    - Basic Auth: the camera challenged, then served the page with the
+      context's http_credentials
+    - Session: the authenticated about page rendered straight away
+    - Form: after the sign-in POST, the about page renders its data
+    - WebUI Next: after the sign-in POST, the login form is swapped out
+
+    Args:
+        page: Playwright page (context should carry http_credentials)
+        ip: Camera IP address
+        username: Camera username
+        password: Camera password
+        timeout: Maximum wait per step in milliseconds
+
+    Returns:
+        Login method used: 'basic', 'session', 'form' or 'webui-next'
+
+    Raises:
+        LoginError: If the camera rejects the credentials
+        Exception: If the camera is unreachable or shows no login state
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    basic = basic_auth_challenge(ip)
+    response = page.goto(f"http://{ip}{LANDING_PATH}", wait_until="commit", timeout=timeout)
+    if response is not None and response.status == 404:
+        # No legacy about page (e.g. WebUI Next); the login lives at the root
+        response = page.goto(f"http://{ip}", wait_until="commit", timeout=timeout)
+    if response is None:
+        raise Exception(f"No response from {ip}")
+    if response.status in (401, 403):
+        print(f" → HTTP {response.status} - wrong credentials on {ip}")
+        raise LoginError("Authentication failed")
+    if not response.ok:
+        raise Exception(f"HTTP {response.status} from {ip}")
+    if basic:
+        print(" → HTTP Basic Auth succeeded.")
+        return "basic"
+
+    try:
+        found = page.wait_for_selector(
+            f"{LEGACY_LOGIN_SELECTOR}, {WEBUI_NEXT_LOGIN_SELECTOR}, {AUTHENTICATED_SELECTOR}",
+            state="visible",
+            timeout=timeout,
+        )
+    except PlaywrightTimeoutError:
+        raise Exception(f"No login page detected on {ip}")
+
+    if _matches(found, AUTHENTICATED_SELECTOR):
+        print(" → Session already authenticated.")
+        return "session"
+
+    legacy = _matches(found, LEGACY_LOGIN_SELECTOR)
+    if legacy:
+        method, label = "form", "Form-based"
+        page.fill(LEGACY_LOGIN_SELECTOR, username)
+        page.fill("#input-password", password)
+        submit = lambda: page.click("#btn-signin")
+    else:
+        method, label = "webui-next", "WebUI Next"
+        page.fill(WEBUI_NEXT_LOGIN_SELECTOR, username)
+        page.fill("#textfield_password", password)
+        submit = lambda: page.get_by_role("button", name="Sign in", exact=True).click()
+
+    try:
+        with page.expect_response(
+            lambda r: _is_login_request(r.request, ip, username), timeout=timeout
+        ) as login_response:
+            submit()
+        status = login_response.value.status
+    except PlaywrightTimeoutError:
+        raise Exception(f"No sign-in request seen on {ip}")
+
+    if status < 400 and legacy:
+        # Legacy forms redirect on success and failure alike, so confirm
+        # on the page that only renders for an authenticated session
+        page.goto(f"http://{ip}{LANDING_PATH}", timeout=timeout)
+        try:
+            found = page.wait_for_selector(
+                f"{AUTHENTICATED_SELECTOR}, {LEGACY_LOGIN_SELECTOR}",
+                state="visible",
+                timeout=timeout,
+            )
+        except PlaywrightTimeoutError:
+            raise Exception(f"No page after sign-in on {ip}")
+        accepted = _matches(found, AUTHENTICATED_SELECTOR)
+    elif status < 400:
+        # WebUI Next answers 200 either way and only swaps the form out
+        # once the credentials are accepted
+        try:
+            page.wait_for_selector(WEBUI_NEXT_LOGIN_SELECTOR, state="hidden", timeout=timeout)
+            accepted = True
+        except PlaywrightTimeoutError:
+            accepted = False
+    else:
+        accepted = False
+
+    if not accepted:
+        print(f" → {label} login FAILED - wrong credentials on {ip}")
+        raise LoginError("Authentication failed")
+
+    print(f" → {label} login succeeded.")
+    return method
+
+
+# --------------------------------------------------------------------
+# HEADLESS SESSIONS FOR WORKER THREADS
+# Playwright's sync API is bound to the thread that started it, so
+# concurrent workers cannot share one browser. A semaphore caps how many
+# headless browsers run at once across every worker.
+# --------------------------------------------------------------------
+MAX_BROWSERS = int(os.getenv("CAMERA_MAX_BROWSERS", "4"))
+_browser_slots = threading.BoundedSemaphore(max(1, MAX_BROWSERS))
+
+
+@contextmanager
+def headless_page(username: str, password: str):
+    """
+    Yield a page in a short-lived headless browser.
+
+    Blocks while CAMERA_MAX_BROWSERS browsers are already running.
+
+    Args:
+        username: Camera username (also used for HTTP Basic Auth)
+        password: Camera password
+    """
+    from playwright.sync_api import sync_playwright
+
+    with _browser_slots, sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            context = browser.new_context(
+                http_credentials={"username": username, "password": password}
+            )
+            yield context.new_page()
+        finally:
+            browser.close()
+
+
+def login_session_headers(ip: str, username: str, password: str) -> dict[str, str]:
+    """
+    Log in through try_login and return the camera's session cookie.
+
+    Used for direct HTTP requests to cameras that refuse Basic Auth and
+    expect the legacy form or WebUI Next login instead.
+
+    Returns:
+        Cookie header dict, or an empty dict if the camera set no cookie
+
+    Raises:
+        LoginError: If the camera rejects the credentials
+    """
+    with headless_page(username, password) as page:
+        try_login(page, ip, username, password)
+        cookies = page.context.cookies(f"http://{ip}")
+    if not cookies:
+        return {}
+    return {"Cookie": "; ".join(f"{c['name']}={c['value']}" for c in cookies)}
@@ -0,0 +1,356 @@
+import csv
+import hashlib
+import http.client
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from common import (
+    LoginError, camera_auth_headers, get_camera_credentials, login_session_headers,
+    resolve_inventory_path, validate_csv,
+)
+
+# --- Sweep settings (override in .env) ---
+SNAPSHOT_PATH = os.getenv("HEALTH_SNAPSHOT_PATH", "/media/still.jpg")
+MAX_WORKERS = int(os.getenv("HEALTH_MAX_WORKERS", "32"))
+TIMEOUT = int(os.getenv("HEALTH_TIMEOUT", "10"))  # seconds per request
+CHUNK_SIZE = 64 * 1024
+
+# SOFn markers carry the frame size; C4/C8/CC share the range but are not frames
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers that may follow entropy-coded data: DHT, DAC, SOS, DQT, DNL, DRI, APPn, COM
+BETWEEN_SCAN_MARKERS = {0xC4, 0xCC, 0xDA, 0xDB, 0xDC, 0xDD, 0xFE} | set(range(0xE0, 0xF0))
+# Markers without a length field: RSTn and TEM
+STANDALONE_MARKERS = set(range(0xD0, 0xD8)) | {0x01}
+
+FIELDNAMES = [
+    "ip_address", "hostname", "reachable", "auth", "auth_method", "http_status",
+    "latency_ms", "bytes", "width", "height", "sha256", "jpeg_well_formed", "error"
+]
+
+
+# --------------------------------------------------------------------
+# HELPERS
+# --------------------------------------------------------------------
+class JpegStreamCheck:
+    """
+    Incremental JPEG structure check, fed one chunk at a time.
+
+    Walks the marker segments, reads the frame size, and scans the
+    entropy-coded data for illegal 0xFF sequences and out-of-order
+    restart markers. At most one marker segment (< 64 KiB) is held in
+    memory. Pixels are not decoded, so corruption that keeps the
+    bitstream well-formed is not detected.
+    """
+
+    def __init__(self):
+        self.size = None
+        self._state = "soi"
+        self._pending = b""
+        self._marker = None
+        self._remaining = 0
+        self._segment = bytearray()
+        self._restart_interval = 0
+        self._next_restart = 0
+        self._scans = 0
+
+    def feed(self, chunk):
+        """Consume the next chunk; raises ValueError as soon as the stream is malformed."""
+        data = self._pending + bytes(chunk)
+        pos, end = 0, len(data)
+        while pos < end:
+            if self._state == "soi":
+                if end - pos < 2:
+                    break
+                if data[pos:pos + 2] != b"\xff\xd8":
+                    raise ValueError("Not a JPEG (missing SOI)")
+                pos += 2
+                self._state = "marker"
+            elif self._state == "marker":
+                if end - pos < 2:
+                    break
+                if data[pos] != 0xFF:
+                    raise ValueError("Corrupt JPEG marker")
+                if data[pos + 1] == 0xFF:  # fill byte
+                    pos += 1
+                    continue
+                self._start_marker(data[pos + 1])
+                pos += 2
+            elif self._state == "length":
+                if end - pos < 2:
+                    break
+                length = int.from_bytes(data[pos:pos + 2], "big")
+                if length < 2:
+                    raise ValueError("Corrupt JPEG segment length")
+                pos += 2
+                self._remaining = length - 2
+                self._segment = bytearray()
+                self._state = "segment"
+                if not self._remaining:
+                    self._end_segment()
+            elif self._state == "segment":
+                take = min(self._remaining, end - pos)
+                self._segment += data[pos:pos + take]
+                pos += take
+                self._remaining -= take
+                if not self._remaining:
+                    self._end_segment()
+            elif self._state == "scan":
+                ff = data.find(b"\xff", pos)
+                if ff < 0:
+                    pos = end
+                elif ff + 1 == end:
+                    pos = ff  # need the byte after 0xFF
+                    break
+                else:
+                    pos = self._scan_marker(data[ff + 1], ff)
+            else:  # done - ignore trailing bytes after EOI
+                pos = end
+        self._pending = data[pos:]
+
+    def close(self):
+        """Finish the stream; returns (width, height) or raises ValueError."""
+        if self._state == "soi" and not self._pending:
+            raise ValueError("Empty snapshot")
+        if self.size is None:
+            raise ValueError("Truncated JPEG header")
+        if self._state != "done":
+            raise ValueError("Truncated JPEG (missing EOI)")
+        return self.size
+
+    def _start_marker(self, marker):
+        if marker == 0xD9:
+            if not self._scans:
+                raise ValueError("JPEG has no image data")
+            self._state = "done"
+        elif marker == 0xD8:
+            raise ValueError("Unexpected SOI inside JPEG")
+        elif marker in STANDALONE_MARKERS:
+            self._state = "marker"
+        else:
+            self._marker = marker
+            self._state = "length"
+
+    def _end_segment(self):
+        segment = self._segment
+        if self._marker in SOF_MARKERS:
+            if len(segment) < 5:
+                raise ValueError("Corrupt JPEG frame header")
+            height = int.from_bytes(segment[1:3], "big")
+            width = int.from_bytes(segment[3:5], "big")
+            if not width:
+                raise ValueError("JPEG frame has zero width")
+            self.size = (width, height)
+        elif self._marker == 0xDD and len(segment) >= 2:
+            self._restart_interval = int.from_bytes(segment[0:2], "big")
+        if self._marker == 0xDA:
+            if self.size is None:
+                raise ValueError("JPEG has no frame header")
+            self._scans += 1
+            self._next_restart = 0
+            self._state = "scan"
+        else:
+            self._state = "marker"
+
+    def _scan_marker(self, follow, ff):
+        """Handle 0xFF inside entropy-coded data; returns the next position."""
+        if follow == 0x00:  # stuffed data byte
+            return ff + 2
+        if follow == 0xFF:  # fill byte before a marker
+            return ff + 1
+        if 0xD0 <= follow <= 0xD7:
+            if not self._restart_interval:
+                raise ValueError("Unexpected JPEG restart marker")
+            if follow != 0xD0 + self._next_restart:
+                raise ValueError("JPEG restart markers out of order")
+            self._next_restart = (self._next_restart + 1) % 8
+            return ff + 2
+        if follow == 0xD9 or follow in BETWEEN_SCAN_MARKERS:
+            self._start_marker(follow)
+            return ff + 2
+        raise ValueError(f"Corrupt JPEG scan data (0xFF{follow:02X})")
+
+
+def stream_snapshot(ip, headers, result):
+    """
+    Fetch one snapshot, hashing and checking it as it streams in.
+
+    Returns:
+        HTTP status; on 401/403 the body is not read so the caller can retry
+    """
+    digest = hashlib.sha256()
+    check = JpegStreamCheck()
+    start = time.monotonic()
+    conn = http.client.HTTPConnection(ip, timeout=TIMEOUT)
+    try:
+        conn.request("GET", SNAPSHOT_PATH, headers=headers)
+        response = conn.getresponse()
+        result["reachable"] = True
+        result["http_status"] = response.status
+        if response.status in (401, 403):
+            return response.status
+        if not 200 <= response.status < 300:
+            raise Exception(f"Snapshot request failed (HTTP {response.status})")
+        result["auth"] = True
+
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            result["bytes"] += len(chunk)
+            check.feed(chunk)
+
+        result["latency_ms"] = round((time.monotonic() - start) * 1000)
+        result["sha256"] = digest.hexdigest()
+        result["width"], result["height"] = check.close()
+        result["jpeg_well_formed"] = True
+        return response.status
+    finally:
+        conn.close()
+
+
+def check_camera(row, username, password):
+    """Check one camera: Basic Auth snapshot first, shared login engine on 401/403."""
+    ip = row["ip_address"].strip()
+    result = {
+        "ip_address": ip,
+        "hostname": row.get("hostname", "").strip(),
+        "reachable": False,
+        "auth": "",  # unknown until the camera answers 2xx or 401/403
+        "auth_method": "basic",
+        "http_status": "",
+        "latency_ms": "",
+        "bytes": 0,
+        "width": "",
+        "height": "",
+        "sha256": "",
+        "jpeg_well_formed": False,
+        "error": "",
+    }
+
+    try:
+        status = stream_snapshot(ip, camera_auth_headers(username, password), result)
+        if status in (401, 403):
+            # Snapshot refused Basic Auth; log in like the other scripts
+            result["auth_method"] = "session"
+            session = login_session_headers(ip, username, password)
+            status = stream_snapshot(ip, session, result)
+            if status in (401, 403):
+                # Credentials were accepted, but the session does not cover the snapshot URL
+                result["auth"] = True
+                raise Exception(f"Snapshot URL refused the login session (HTTP {status})")
+    except LoginError as e:
+        result["auth"] = False
+        result["error"] = str(e)
+    except Exception as e:
+        # Playwright errors carry multi-line banners; keep the CSV to one line
+        result["error"] = (str(e).splitlines() or [type(e).__name__])[0]
+
+    status = "OK" if result["jpeg_well_formed"] else f"FAILED - {result['error']}"
+    print(f" → {ip} ({result['hostname']}): {status}")
+    return result
+
+
+def main():
+    # --- Get credentials from .env ---
+    username, password = get_camera_credentials()
+
+    # --- Prompt for schools ---
+    schools_input = input("Select school numbers (e.g., 001,016) or 'all': ").strip()
+
+    # --- File paths ---
+    # Use 'onedrive', 'local', or any custom path
+    base_dir = resolve_inventory_path()
+
+    if not schools_input:
+        print("[ERROR] No school selected.")
+        exit(1)
+
+    if schools_input.lower() == "all":
+        if not os.path.isdir(base_dir):
+            print(f"[ERROR] Inventory folder not found: {base_dir}")
+            exit(1)
+        schools = sorted(
+            entry for entry in os.listdir(base_dir)
+            if os.path.isfile(os.path.join(base_dir, entry, "camera_data.csv"))
+        )
+    else:
+        schools = [s.strip() for s in schools_input.split(",") if s.strip()]
+
+    if not schools:
+        print(f"[ERROR] No school folders with camera_data.csv found in: {base_dir}")
+        exit(1)
+
+    # --- Load every school's cameras into one sweep ---
+    cameras = []
+    for school in schools:
+        csv_path = os.path.join(base_dir, school, "camera_data.csv")
+        validate_csv(csv_path)
+        with open(csv_path, newline='', encoding='utf-8-sig') as csvfile:
+            for row in csv.DictReader(csvfile):
+                cameras.append((school, row))
+
+    if not cameras:
+        print("[ERROR] No cameras found in the selected camera_data.csv files.")
+        exit(1)
+
+    print(f"Checking {len(cameras)} cameras across {len(schools)} school(s)...")
+
+    # Session-login fallbacks share the CAMERA_MAX_BROWSERS cap from common.py
+    results = {school: [] for school in schools}
+    sweep_start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = {
+            pool.submit(check_camera, row, username, password): school
+            for school, row in cameras
+        }
+        for future in as_completed(futures):
+            results[futures[future]].append(future.result())
+    sweep_seconds = time.monotonic() - sweep_start
+
+    # --- Write results to each school's inventory folder ---
+    output_paths = []
+    for school, school_results in results.items():
+        order = {}
+        for i, (s, row) in enumerate(cameras):
+            if s == school:
+                order[row["ip_address"].strip()] = i
+        school_results.sort(key=lambda r: order[r["ip_address"]])
+
+        output_path = os.path.join(base_dir, school, f"{school}_health_check.csv")
+        with open(output_path, "w", newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES, quoting=csv.QUOTE_ALL)
+            writer.writeheader()
+            writer.writerows(school_results)
+        output_paths.append(output_path)
+
+    # --- Print summary ---
+    all_results = [r for school_results in results.values() for r in school_results]
+    unreachable = [r for r in all_results if not r["reachable"]]
+    auth_failed = [r for r in all_results if r["auth"] is False]
+    unhealthy = [r for r in all_results if not r["jpeg_well_formed"]]
+
+    print("\n" + "="*70)
+    print("SUMMARY")
+    print("="*70)
+    print(f"Total number of cameras: {len(all_results)}")
+    print(f"Healthy (well-formed JPEG snapshot): {len(all_results) - len(unhealthy)}")
+    print(f"Unreachable: {len(unreachable)}")
+    print(f"Login failed: {len(auth_failed)}")
+    print(f"Sweep time: {sweep_seconds:.1f}s")
+
+    if unhealthy:
+        print("\n=== UNHEALTHY CAMERAS ===")
+        print(f"{'IP Address':<15} {'Hostname':<30} {'Error'}")
+        print("-" * 70)
+        for r in unhealthy:
+            print(f"{r['ip_address']:<15} {r['hostname']:<30} {r['error']}")
+    else:
+        print("\n✅ All cameras returned a well-formed snapshot.")
+
+    for output_path in output_paths:
+        print(f"✅ Health report: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
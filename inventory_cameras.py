@@ -3,7 +3,7 @@ import os
 import time
 from datetime import datetime
 from playwright.sync_api import sync_playwright
-from common import get_camera_credentials, resolve_inventory_path, validate_csv
+from common import get_camera_credentials, resolve_inventory_path, validate_csv, try_login
 
 # --- Get credentials from .env ---
 USERNAME, PASSWORD = get_camera_credentials()
@@ -20,54 +20,6 @@ csv_path = os.path.join(base_dir, school, "camera_data.csv")
 # Validate CSV file before processing
 validate_csv(csv_path)
 
-# --------------------------------------------------------------------
-# LOGIN HANDLER
-# Supports:
-# 1. Old HTML login form
-# 2. WebUI Next / Material UI React login
-# 3. Basic Auth fallback
-# --------------------------------------------------------------------
-def try_login(page, ip):
-    # --- Legacy login form ---
-    try:
-        page.wait_for_selector("#input-username", timeout=3000)
-        page.fill("#input-username", USERNAME)
-        page.fill("#input-password", PASSWORD)
-        page.click("#btn-signin")
-        print(" → Form-based login succeeded.")
-        page.wait_for_timeout(2000)
-        return
-    except:
-        pass
-
-    # --- New React WebUI Next login ---
-    try:
-        # Wait for Material UI login fields
-        page.wait_for_selector("#textfield_username", timeout=5000)
-        page.fill("#textfield_username", USERNAME)
-        page.fill("#textfield_password", PASSWORD)
-
-        # Click the Material UI "Sign in" button
-        page.get_by_role("button", name="Sign in", exact=True).click()
-        page.wait_for_timeout(3000)
-        
-        # Check if login failed (error message appears)
-        if page.locator("#textfield_username").is_visible(timeout=2000):
-            print(f" → WebUI Next login FAILED - wrong credentials on {ip}")
-            raise Exception("Authentication failed")
-        
-        print(" → WebUI Next login succeeded.")
-        return
-    except Exception as e:
-        # If it's authentication failure, re-raise it to stop processing this camera
-        if "Authentication failed" in str(e):
-            raise
-        # Otherwise it's just timeout (no WebUI Next form), continue to next method
-        pass
-
-    # --- Basic Auth fallback ---
-    print(f" → No login form present on {ip} — assuming Basic Auth.")
-
 # --- Helper for safely reading locator text ---
 def safe_text(locator):
     try:
@@ -113,8 +65,7 @@ with open(csv_path, newline='', encoding='utf-8-sig') as csvfile:
 
             try:
                 # --- LOGIN ---
-                page.goto(f"http://{ip}")
-                try_login(page, ip)
+                try_login(page, ip, USERNAME, PASSWORD)
                 successful_logins += 1
 
                 # --- ABOUT PAGE ---
@@ -0,0 +1,47 @@
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from fake_camera import FakeCamera
+
+
+@pytest.fixture
+def camera_factory():
+    cameras = []
+
+    def start(**kwargs):
+        camera = FakeCamera(**kwargs).start()
+        cameras.append(camera)
+        return camera
+
+    yield start
+    for camera in cameras:
+        camera.stop()
+
+
+@pytest.fixture
+def fake_camera(camera_factory):
+    return camera_factory()
+
+
+@pytest.fixture
+def browser_page_factory():
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as p:
+        try:
+            browser = p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {str(e).splitlines()[0]}")
+
+        def new_page(username="admin", password="secret"):
+            context = browser.new_context(
+                http_credentials={"username": username, "password": password}
+            )
+            return context.new_page()
+
+        yield new_page
+        browser.close()
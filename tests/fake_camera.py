@@ -0,0 +1,194 @@
+"""Minimal in-process fake Avigilon camera for login, rollout and health tests."""
+import base64
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# The real about page fills the version in client-side; mimic that
+ABOUT_PAGE = """<html><body>
+<span id="text-partNumber">{part_number}</span>
+<span id="text-firmwareVersion"></span>
+<script>document.getElementById("text-firmwareVersion").textContent = "{version}";</script>
+</body></html>"""
+
+LEGACY_LOGIN_PAGE = b"""<html><body>
+<form method="post" action="/login.cgi">
+<input id="input-username" name="username">
+<input id="input-password" name="password" type="password">
+<input id="btn-signin" type="submit" value="Sign in">
+</form>
+</body></html>"""
+
+# React-style login: telemetry and login calls via fetch, form swapped out on success
+WEBUI_NEXT_LOGIN_PAGE = b"""<html><body><div id="app">
+<input id="textfield_username"><input id="textfield_password" type="password">
+<button type="button">Sign in</button>
+</div>
+<script>
+document.querySelector("button").onclick = async () => {
+  await fetch("/api/telemetry", {method: "POST", body: "{}"});
+  const response = await fetch("/api/login", {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify({
+      username: document.getElementById("textfield_username").value,
+      password: document.getElementById("textfield_password").value,
+    }),
+  });
+  if ((await response.json()).ok) {
+    document.getElementById("app").innerHTML = "<div>Dashboard</div>";
+  }
+};
+</script></body></html>"""
+
+
+class FakeCamera:
+    """
+    Camera that logs in like one of the real UIs, accepts a multipart
+    firmware upload, "reboots" (answers 503) for a while, then reports
+    the new version, and serves a snapshot.
+
+    login: 'basic' (HTTP Basic Auth), 'legacy' (HTML form), 'webui-next'
+    (React form over fetch) or 'open' (no authentication).
+    """
+
+    def __init__(self, login="basic", username="admin", password="secret",
+                 version="4.10.0.1", new_version="4.12.0.36", part_number="H5A-DO1",
+                 upload_path="/upload", snapshot=b"", reboot_seconds=0.5, reply_delay=0.0):
+        self.login = login
+        self.username = username
+        self.password = password
+        self.version = version
+        self.new_version = new_version
+        self.part_number = part_number
+        self.upload_path = upload_path
+        self.snapshot = snapshot
+        self.reboot_seconds = reboot_seconds
+        self.reply_delay = reply_delay
+        self.received = b""
+        self.rebooting_until = 0.0
+        self.sessions = set()
+        self._auth = "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        host, port = self._server.server_address
+        return f"{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _new_session(self):
+        token = uuid.uuid4().hex
+        self.sessions.add(token)
+        return {"Set-Cookie": f"session={token}; Path=/"}
+
+    def _handler(self):
+        camera = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self):
+                if camera.login == "open":
+                    return True
+                if camera.login == "basic":
+                    return self.headers.get("Authorization") == camera._auth
+                cookies = self.headers.get("Cookie", "")
+                return any(f"session={token}" in cookies for token in camera.sessions)
+
+            def _rebooting(self):
+                if time.monotonic() < camera.rebooting_until:
+                    self._reply(503)
+                    return True
+                return False
+
+            def _refuse(self):
+                if camera.login == "basic":
+                    self._reply(401, headers={"WWW-Authenticate": 'Basic realm="camera"'})
+                else:
+                    self._reply(401)
+
+            def do_GET(self):
+                if self._rebooting():
+                    return
+                if self.path == "/web/about.shtml" and camera.login == "webui-next":
+                    self._reply(404)
+                    return
+                if not self._authorized():
+                    if camera.login == "basic" or self.path.startswith("/media/"):
+                        self._refuse()
+                    elif camera.login == "legacy":
+                        self._reply(200, LEGACY_LOGIN_PAGE, {"Content-Type": "text/html"})
+                    else:
+                        self._reply(200, WEBUI_NEXT_LOGIN_PAGE, {"Content-Type": "text/html"})
+                    return
+                if self.path == "/web/about.shtml":
+                    body = ABOUT_PAGE.format(
+                        part_number=camera.part_number, version=camera.version
+                    ).encode()
+                    self._reply(200, body, {"Content-Type": "text/html"})
+                elif self.path.startswith("/media/") and camera.snapshot:
+                    self._reply(200, camera.snapshot, {"Content-Type": "image/jpeg"})
+                elif self.path.startswith("/media/"):
+                    self._reply(404)
+                else:
+                    self._reply(200, b"<html><body>Camera</body></html>", {"Content-Type": "text/html"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if self._rebooting():
+                    return
+                if self.path == "/login.cgi" and camera.login == "legacy":
+                    form = parse_qs(body.decode())
+                    if (form.get("username") == [camera.username]
+                            and form.get("password") == [camera.password]):
+                        headers = camera._new_session()
+                        headers["Location"] = "/web/about.shtml"
+                    else:
+                        headers = {"Location": "/"}
+                    self._reply(302, headers=headers)
+                    return
+                if self.path == "/api/login" and camera.login == "webui-next":
+                    data = json.loads(body or b"{}")
+                    ok = data.get("username") == camera.username and data.get("password") == camera.password
+                    headers = camera._new_session() if ok else {}
+                    headers["Content-Type"] = "application/json"
+                    self._reply(200, json.dumps({"ok": ok}).encode(), headers)
+                    return
+                if self.path == "/api/telemetry":
+                    self._reply(204)
+                    return
+                if not self._authorized():
+                    self._refuse()
+                    return
+                if self.path != camera.upload_path:
+                    self._reply(404)
+                    return
+                camera.received = body
+                time.sleep(camera.reply_delay)
+                self._reply(200)
+                camera.version = camera.new_version
+                camera.rebooting_until = time.monotonic() + camera.reboot_seconds
+
+        return Handler
@@ -0,0 +1,152 @@
+import io
+
+import pytest
+
+import health_check_cameras
+from common import LoginError
+from health_check_cameras import JpegStreamCheck, check_camera
+
+
+def segment(marker, payload, fill=b""):
+    return fill + b"\xff" + bytes([marker]) + (len(payload) + 2).to_bytes(2, "big") + payload
+
+
+def make_jpeg(sof=0xC0, width=1920, height=1080, scans=(b"\x12\xff\x00\x34",),
+              restart_interval=0, fill=b""):
+    """Structurally valid JPEG; quantisation table holds 0xFF bytes on purpose."""
+    frame = bytes([8]) + height.to_bytes(2, "big") + width.to_bytes(2, "big") + b"\x01\x01\x11\x00"
+    parts = [
+        b"\xff\xd8",
+        segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00", fill),
+        segment(0xDB, b"\x00" + b"\xff" * 64, fill),
+        segment(sof, frame, fill),
+    ]
+    if restart_interval:
+        parts.append(segment(0xDD, restart_interval.to_bytes(2, "big"), fill))
+    for scan in scans:
+        parts.append(segment(0xC4, b"\x00" + bytes(16), fill))
+        parts.append(segment(0xDA, b"\x01\x01\x00\x00\x3f\x00", fill))
+        parts.append(scan)
+    parts.append(fill + b"\xff\xd9")
+    return b"".join(parts)
+
+
+def run_check(data, chunk_size=None):
+    check = JpegStreamCheck()
+    step = chunk_size or len(data) or 1
+    for offset in range(0, len(data), step):
+        check.feed(data[offset:offset + step])
+    return check.close()
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 7])
+def test_baseline_any_chunking(chunk_size):
+    assert run_check(make_jpeg(), chunk_size) == (1920, 1080)
+
+
+def test_fill_bytes_before_markers():
+    assert run_check(make_jpeg(fill=b"\xff\xff"), 3) == (1920, 1080)
+
+
+def test_progressive_multiple_scans():
+    scans = (b"\x01\x02", b"\x03\xff\x00", b"\x04")
+    assert run_check(make_jpeg(sof=0xC2, width=640, height=480, scans=scans), 5) == (640, 480)
+
+
+def test_restart_markers_in_order():
+    scan = b"\x11\xff\xd0\x22\xff\xd1\x33\xff\xd2\x44"
+    assert run_check(make_jpeg(scans=(scan,), restart_interval=4), 2) == (1920, 1080)
+
+
+def test_restart_markers_out_of_order():
+    scan = b"\x11\xff\xd0\x22\xff\xd2\x33"
+    with pytest.raises(ValueError, match="out of order"):
+        run_check(make_jpeg(scans=(scan,), restart_interval=4))
+
+
+def test_corrupt_scan_data():
+    with pytest.raises(ValueError, match="scan data"):
+        run_check(make_jpeg(scans=(b"\x12\xff\x42\x34",)))
+
+
+def test_truncated_before_eoi():
+    with pytest.raises(ValueError, match="missing EOI"):
+        run_check(make_jpeg()[:-2], 4)
+
+
+def test_truncated_header():
+    with pytest.raises(ValueError, match="Truncated JPEG header"):
+        run_check(make_jpeg()[:40])
+
+
+def test_non_jpeg_input():
+    with pytest.raises(ValueError, match="Not a JPEG"):
+        run_check(b"<html><body>Login</body></html>")
+
+
+def test_empty_snapshot():
+    with pytest.raises(ValueError, match="Empty"):
+        JpegStreamCheck().close()
+
+
+@pytest.mark.parametrize("progressive", [False, True])
+def test_real_encoder_output(progressive):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.effect_noise((320, 240), 40).convert("RGB").save(
+        buffer, "JPEG", quality=80, progressive=progressive
+    )
+    assert run_check(buffer.getvalue(), 4096) == (320, 240)
+
+
+def test_check_camera_basic_snapshot(camera_factory):
+    camera = camera_factory(snapshot=make_jpeg())
+    result = check_camera({"ip_address": camera.address, "hostname": "A"}, "admin", "secret")
+    assert result["jpeg_well_formed"] and result["auth"] is True
+    assert result["auth_method"] == "basic"
+    assert result["bytes"] == len(camera.snapshot)
+
+
+def test_check_camera_missing_snapshot_leaves_auth_unknown(camera_factory):
+    camera = camera_factory()
+    result = check_camera({"ip_address": camera.address, "hostname": "A"}, "admin", "secret")
+    assert result["http_status"] == 404
+    assert result["auth"] == ""
+    assert not result["jpeg_well_formed"]
+
+
+def test_check_camera_rejected_login(camera_factory, monkeypatch):
+    def rejected(*args):
+        raise LoginError("Authentication failed")
+
+    monkeypatch.setattr(health_check_cameras, "login_session_headers", rejected)
+    camera = camera_factory(snapshot=make_jpeg())
+    result = check_camera({"ip_address": camera.address, "hostname": "A"}, "admin", "wrong")
+    assert result["auth"] is False
+    assert result["error"] == "Authentication failed"
+
+
+def test_check_camera_session_fallback(camera_factory, monkeypatch):
+    camera = camera_factory(login="legacy", snapshot=make_jpeg())
+    camera.sessions.add("token")
+    monkeypatch.setattr(health_check_cameras, "login_session_headers",
+                        lambda *args: {"Cookie": "session=token"})
+    result = check_camera({"ip_address": camera.address, "hostname": "A"}, "admin", "secret")
+    assert result["jpeg_well_formed"]
+    assert result["auth_method"] == "session"
+
+
+def test_check_camera_session_not_valid_for_snapshot(camera_factory, monkeypatch):
+    camera = camera_factory(login="legacy", snapshot=make_jpeg())
+    monkeypatch.setattr(health_check_cameras, "login_session_headers",
+                        lambda *args: {"Cookie": "session=other"})
+    result = check_camera({"ip_address": camera.address, "hostname": "A"}, "admin", "secret")
+    assert result["auth"] is True
+    assert "refused the login session" in result["error"]
+
+
+def test_check_camera_session_login_in_browser(camera_factory, browser_page_factory):
+    camera = camera_factory(login="legacy", snapshot=make_jpeg())
+    result = check_camera({"ip_address": camera.address, "hostname": "A"}, "admin", "secret")
+    assert result["jpeg_well_formed"]
+    assert result["auth_method"] == "session"
@@ -0,0 +1,163 @@
+import contextlib
+import json
+from types import SimpleNamespace
+from urllib.parse import urlencode, urlparse
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from common import (
+    AUTHENTICATED_SELECTOR, LANDING_PATH, LEGACY_LOGIN_SELECTOR, WEBUI_NEXT_LOGIN_SELECTOR,
+    LoginError, _is_login_request, basic_auth_challenge, try_login,
+)
+
+
+def response(status, url, post_data=None):
+    request = SimpleNamespace(method="POST" if post_data is not None else "GET",
+                              url=url, post_data=post_data)
+    return SimpleNamespace(status=status, ok=200 <= status < 300, url=url, request=request)
+
+
+class ScriptedPage:
+    """
+    Stand-in for a Playwright page that shows what each FakeCamera UI
+    renders, so the engine's branches run without a browser install.
+    """
+
+    def __init__(self, camera, username="admin", password="secret"):
+        self.camera = camera
+        self.credentials = (username, password)
+        self.visible = set()
+        self.values = {}
+        self.responses = []
+        self.logged_in = False
+        self.waits = []
+
+    def goto(self, url, **kwargs):
+        camera = self.camera
+        if camera.login == "basic":
+            if self.credentials != (camera.username, camera.password):
+                return response(401, url)
+            return response(200, url)
+        if camera.login == "webui-next" and urlparse(url).path == LANDING_PATH:
+            return response(404, url)
+        if camera.login == "open" or self.logged_in:
+            self.visible = {AUTHENTICATED_SELECTOR}
+        elif camera.login == "legacy":
+            self.visible = {LEGACY_LOGIN_SELECTOR}
+        else:
+            self.visible = {WEBUI_NEXT_LOGIN_SELECTOR}
+        return response(200, url)
+
+    def wait_for_selector(self, selector, state="visible", timeout=None):
+        self.waits.append((selector, state))
+        parts = [part.strip() for part in selector.split(",")]
+        if state == "hidden":
+            if any(part in self.visible for part in parts):
+                raise PlaywrightTimeoutError(f"{selector} still visible")
+            return None
+        for part in parts:
+            if part in self.visible:
+                return SimpleNamespace(evaluate=lambda script, sel, part=part: sel == part)
+        raise PlaywrightTimeoutError(f"{selector} never visible")
+
+    def fill(self, selector, value):
+        self.values[selector] = value
+
+    def click(self, selector):
+        assert selector == "#btn-signin"
+        self._sign_in(LEGACY_LOGIN_SELECTOR, "#input-password")
+
+    def get_by_role(self, role, name, exact):
+        return SimpleNamespace(
+            click=lambda: self._sign_in(WEBUI_NEXT_LOGIN_SELECTOR, "#textfield_password")
+        )
+
+    @contextlib.contextmanager
+    def expect_response(self, predicate, timeout=None):
+        info = SimpleNamespace(value=None)
+        start = len(self.responses)
+        yield info
+        for r in self.responses[start:]:
+            if predicate(r):
+                info.value = r
+                return
+        raise PlaywrightTimeoutError("No matching response")
+
+    def _sign_in(self, username_selector, password_selector):
+        camera = self.camera
+        username, password = self.values[username_selector], self.values[password_selector]
+        ok = (username, password) == (camera.username, camera.password)
+        base = f"http://{camera.address}"
+        self.responses.append(response(204, f"{base}/api/telemetry", post_data="{}"))
+        self.logged_in = ok
+        if username_selector == LEGACY_LOGIN_SELECTOR:
+            body = urlencode({"username": username, "password": password})
+            self.responses.append(response(302, f"{base}/login.cgi", post_data=body))
+            self.visible = {AUTHENTICATED_SELECTOR} if ok else {LEGACY_LOGIN_SELECTOR}
+        else:
+            body = json.dumps({"username": username, "password": password})
+            self.responses.append(response(200, f"{base}/api/login", post_data=body))
+            if ok:
+                self.visible = set()
+
+
+@pytest.mark.parametrize("login, method", [
+    ("legacy", "form"),
+    ("webui-next", "webui-next"),
+    ("basic", "basic"),
+    ("open", "session"),
+])
+def test_login_branches(camera_factory, login, method):
+    camera = camera_factory(login=login)
+    assert try_login(ScriptedPage(camera), camera.address, "admin", "secret") == method
+
+
+@pytest.mark.parametrize("login", ["legacy", "webui-next", "basic"])
+def test_wrong_password_raises_login_error(camera_factory, login):
+    camera = camera_factory(login=login)
+    page = ScriptedPage(camera, password="wrong")
+    with pytest.raises(LoginError):
+        try_login(page, camera.address, "admin", "wrong")
+
+
+def test_basic_auth_does_not_wait_for_forms(camera_factory):
+    camera = camera_factory(login="basic")
+    page = ScriptedPage(camera)
+    try_login(page, camera.address, "admin", "secret")
+    assert page.waits == []
+
+
+def test_basic_auth_challenge_probe(camera_factory):
+    assert basic_auth_challenge(camera_factory(login="basic").address)
+    assert not basic_auth_challenge(camera_factory(login="legacy").address)
+    assert not basic_auth_challenge(camera_factory(login="open").address)
+
+
+def test_login_request_matches_only_sign_in_post_to_camera():
+    login = response(200, "http://10.0.0.1/api/login", post_data='{"username": "admin"}')
+    assert _is_login_request(login.request, "10.0.0.1", "admin")
+    assert not _is_login_request(login.request, "10.0.0.12", "admin")
+    telemetry = response(204, "http://10.0.0.1/api/telemetry", post_data="{}")
+    assert not _is_login_request(telemetry.request, "10.0.0.1", "admin")
+    page_load = response(200, "http://10.0.0.1/?username=admin")
+    assert not _is_login_request(page_load.request, "10.0.0.1", "admin")
+
+
+@pytest.mark.parametrize("login, method", [
+    ("legacy", "form"),
+    ("webui-next", "webui-next"),
+    ("basic", "basic"),
+    ("open", "session"),
+])
+def test_login_in_browser(camera_factory, browser_page_factory, login, method):
+    camera = camera_factory(login=login)
+    assert try_login(browser_page_factory(), camera.address, "admin", "secret") == method
+
+
+@pytest.mark.parametrize("login", ["legacy", "webui-next", "basic"])
+def test_wrong_password_in_browser(camera_factory, browser_page_factory, login):
+    camera = camera_factory(login=login)
+    with pytest.raises(LoginError):
+        try_login(browser_page_factory(password="wrong"), camera.address, "admin", "wrong",
+                  timeout=3000)
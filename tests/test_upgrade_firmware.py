@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+import upgrade_firmware
+from common import LoginError, camera_auth_headers
+from upgrade_firmware import (
+    BandwidthLimiter, camera_ready, read_firmware_version, upload_camera, upload_firmware,
+    version_tuple, wait_for_version,
+)
+
+IMAGE = bytes(range(256)) * 1024  # 256 KiB, spans several chunks
+AUTH = camera_auth_headers("admin", "secret")
+
+
+def test_version_tuple_orders_numerically():
+    assert version_tuple("4.10.0.1") > version_tuple("4.9.2.0")
+    assert version_tuple("") == ()
+
+
+def test_upload_streams_whole_image(fake_camera):
+    limiter = BandwidthLimiter(1000)
+    assert upload_firmware(fake_camera.address, memoryview(IMAGE), "fw.bin", limiter, AUTH,
+                           upload_path=fake_camera.upload_path)
+    assert IMAGE in fake_camera.received
+    assert b'name="firmware"; filename="fw.bin"' in fake_camera.received
+
+
+def test_upload_rejects_wrong_credentials(fake_camera):
+    with pytest.raises(LoginError):
+        upload_firmware(fake_camera.address, memoryview(IMAGE), "fw.bin", BandwidthLimiter(1000),
+                        camera_auth_headers("admin", "wrong"), upload_path=fake_camera.upload_path)
+
+
+def test_slow_reply_is_unconfirmed_not_failed(fake_camera):
+    fake_camera.reply_delay = 1.0
+    assert not upload_firmware(fake_camera.address, memoryview(IMAGE), "fw.bin",
+                               BandwidthLimiter(1000), AUTH,
+                               upload_path=fake_camera.upload_path, response_timeout=0.2)
+    assert IMAGE in fake_camera.received
+
+
+def test_wait_for_version_accepts_newer_and_times_out():
+    assert wait_for_version(lambda: "4.12.1.0", "4.12.0.36", timeout=1, interval=0.1) == "4.12.1.0"
+    with pytest.raises(Exception, match="last seen: 4.10.0.1"):
+        wait_for_version(lambda: "4.10.0.1", "4.12.0.36", timeout=0.3, interval=0.1)
+
+
+def test_upload_then_version_confirmed_after_reboot(fake_camera, browser_page_factory):
+    browser_page = browser_page_factory()
+    upload_firmware(fake_camera.address, memoryview(IMAGE), "fw.bin", BandwidthLimiter(1000), AUTH,
+                    upload_path=fake_camera.upload_path)
+    version = wait_for_version(
+        lambda: read_firmware_version(browser_page, fake_camera.address, "admin", "secret"),
+        "4.12.0.36", timeout=15, interval=0.5,
+    )
+    assert version == "4.12.0.36"
+
+
+def test_bandwidth_limiter_below_one_chunk_per_second():
+    limiter = BandwidthLimiter(0.4)  # 50 kB/s, less than one 64 KiB chunk
+    start = time.monotonic()
+    limiter.consume(65536)  # initial burst
+    limiter.consume(65536)  # has to wait for 65536 / 50000 = 1.31 s of tokens
+    elapsed = time.monotonic() - start
+    assert 1.2 < elapsed < 3
+
+
+def test_bandwidth_limiter_caps_shared_throughput():
+    limiter = BandwidthLimiter(8)  # 1 MB/s, bucket starts with one second of tokens
+    start = time.monotonic()
+    for _ in range(24):  # 1.5 MB
+        limiter.consume(65536)
+    assert time.monotonic() - start > 0.4
+
+
+def test_bandwidth_limiter_rejects_non_positive():
+    with pytest.raises(ValueError):
+        BandwidthLimiter(0)
+
+
+def test_wait_for_version_stops_on_login_error():
+    def rejected():
+        raise LoginError("Authentication failed")
+
+    start = time.monotonic()
+    with pytest.raises(LoginError):
+        wait_for_version(rejected, "4.12.0.36", timeout=30, interval=1)
+    assert time.monotonic() - start < 1
+
+
+def test_read_firmware_version_propagates_login_error(monkeypatch):
+    def rejected(*args):
+        raise LoginError("Authentication failed")
+
+    monkeypatch.setattr(upgrade_firmware, "try_login", rejected)
+    with pytest.raises(LoginError):
+        read_firmware_version(None, "10.0.0.1", "admin", "wrong")
+
+
+def test_read_firmware_version_empty_while_unreachable(monkeypatch):
+    def unreachable(*args):
+        raise OSError("Connection refused")
+
+    monkeypatch.setattr(upgrade_firmware, "try_login", unreachable)
+    assert read_firmware_version(None, "10.0.0.1", "admin", "secret") == ""
+
+
+def test_camera_ready_tracks_reboot(fake_camera):
+    assert camera_ready(fake_camera.address)
+    fake_camera.rebooting_until = time.monotonic() + 5
+    assert not camera_ready(fake_camera.address)
+
+
+def test_upload_stage_with_basic_auth(fake_camera, monkeypatch):
+    monkeypatch.setattr(upgrade_firmware, "UPLOAD_PATH", fake_camera.upload_path)
+    row = {"ip_address": fake_camera.address, "hostname": "A", "firmware_version": "4.10.0.1"}
+    result = upload_camera(row, memoryview(IMAGE), "fw.bin", BandwidthLimiter(1000), "admin", "secret")
+    assert result["status"] == "OK"
+    assert IMAGE in fake_camera.received
+
+
+def test_upload_stage_uses_login_session(camera_factory, browser_page_factory, monkeypatch):
+    camera = camera_factory(login="legacy")
+    monkeypatch.setattr(upgrade_firmware, "UPLOAD_PATH", camera.upload_path)
+    row = {"ip_address": camera.address, "hostname": "A", "firmware_version": "4.10.0.1"}
+    result = upload_camera(row, memoryview(IMAGE), "fw.bin", BandwidthLimiter(1000), "admin", "secret")
+    assert result["status"] == "OK"
+    assert IMAGE in camera.received
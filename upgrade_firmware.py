@@ -0,0 +1,351 @@
+import csv
+import http.client
+import mmap
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from common import (
+    LoginError, basic_auth_challenge, camera_auth_headers, get_camera_credentials, headless_page,
+    login_session_headers, resolve_inventory_path, try_login, validate_csv,
+)
+
+# --- Rollout settings (override in .env) ---
+# Upload endpoint differs by camera model/firmware, so it must be configured
+UPLOAD_PATH = os.getenv("FIRMWARE_UPLOAD_PATH")
+UPLOAD_FIELD = os.getenv("FIRMWARE_UPLOAD_FIELD", "firmware")
+MAX_WORKERS = int(os.getenv("FIRMWARE_MAX_WORKERS", "8"))
+BANDWIDTH_MBPS = float(os.getenv("FIRMWARE_BANDWIDTH_MBPS", "50"))       # shared by all uploads
+RESPONSE_TIMEOUT = int(os.getenv("FIRMWARE_RESPONSE_TIMEOUT", "600"))   # camera validates before replying
+REBOOT_TIMEOUT = int(os.getenv("FIRMWARE_REBOOT_TIMEOUT", "900"))       # seconds per camera
+SEND_TIMEOUT = 120
+POLL_INTERVAL = 15
+CHUNK_SIZE = 64 * 1024
+
+
+# --------------------------------------------------------------------
+# HELPERS
+# --------------------------------------------------------------------
+def version_tuple(version):
+    """Turn '4.12.0.36' into (4, 12, 0, 36) for ordering; non-numeric parts are ignored."""
+    return tuple(int(part) for part in re.findall(r"\d+", version or ""))
+
+
+class BandwidthLimiter:
+    """Token bucket shared by every upload thread to cap total throughput."""
+
+    def __init__(self, mbps):
+        if mbps <= 0:
+            raise ValueError("Bandwidth limit must be greater than 0 Mbit/s")
+        self.rate = mbps * 1_000_000 / 8  # bytes per second
+        # Bucket must hold at least one chunk or slow limits could never send
+        self.capacity = max(self.rate, CHUNK_SIZE)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, nbytes):
+        nbytes = min(nbytes, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= nbytes:
+                    self.tokens -= nbytes
+                    return
+                wait = (nbytes - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def upload_firmware(ip, image, filename, limiter, auth_headers,
+                    upload_path=None, field=UPLOAD_FIELD, response_timeout=RESPONSE_TIMEOUT):
+    """
+    Stream the firmware image to one camera as multipart/form-data.
+
+    The image is a memoryview over the shared memory map, so every
+    camera reads the same pages and nothing is copied per upload.
+
+    Returns:
+        True if the camera acknowledged the upload, False if the whole
+        image was sent but the camera did not reply in time (it is
+        usually busy flashing, so the caller should still wait for it)
+    """
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+
+    conn = http.client.HTTPConnection(ip, timeout=SEND_TIMEOUT)
+    try:
+        conn.putrequest("POST", upload_path or UPLOAD_PATH)
+        for key, value in auth_headers.items():
+            conn.putheader(key, value)
+        conn.putheader("Content-Type", f"multipart/form-data; boundary={boundary}")
+        conn.putheader("Content-Length", str(len(head) + len(image) + len(tail)))
+        conn.endheaders()
+
+        conn.send(head)
+        for offset in range(0, len(image), CHUNK_SIZE):
+            chunk = image[offset:offset + CHUNK_SIZE]
+            limiter.consume(len(chunk))
+            conn.send(chunk)
+        conn.send(tail)
+
+        conn.sock.settimeout(response_timeout)
+        try:
+            response = conn.getresponse()
+            response.read()
+        except socket.timeout:
+            return False
+        if response.status in (401, 403):
+            raise LoginError("Authentication failed")
+        if response.status >= 400:
+            raise Exception(f"Upload rejected (HTTP {response.status})")
+        return True
+    finally:
+        conn.close()
+
+
+def read_firmware_version(page, ip, username, password):
+    """
+    Read the firmware version the same way inventory_cameras.py does.
+
+    The about page fills the version in client-side, so this logs in
+    through the shared login engine and reads the rendered field.
+    Returns '' while the camera is rebooting; rejected credentials raise
+    LoginError so they are not mistaken for a slow reboot.
+    """
+    try:
+        try_login(page, ip, username, password)
+        page.goto(f"http://{ip}/web/about.shtml")
+        page.wait_for_selector("#text-firmwareVersion:not(:empty)", timeout=10000)
+        return page.locator("#text-firmwareVersion").text_content().strip()
+    except LoginError:
+        raise
+    except Exception:
+        return ""
+
+
+def camera_ready(ip):
+    """True once the camera answers HTTP again (any status below 500)."""
+    conn = http.client.HTTPConnection(ip, timeout=5)
+    try:
+        conn.request("GET", "/")
+        response = conn.getresponse()
+        response.read()
+        return response.status < 500
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def poll_firmware_version(ip, username, password):
+    """One confirmation poll: a cheap HTTP check, then a browser read only if the camera is up."""
+    if not camera_ready(ip):
+        return ""
+    with headless_page(username, password) as page:
+        return read_firmware_version(page, ip, username, password)
+
+
+def wait_for_version(read_version, target, timeout=REBOOT_TIMEOUT, interval=POLL_INTERVAL):
+    """
+    Poll until the camera reports the target version or newer.
+
+    Args:
+        read_version: Callable returning the current version, or '' if unreachable
+        target: Target firmware version
+        timeout: Seconds to wait for the camera to come back upgraded
+        interval: Seconds between polls
+
+    Returns:
+        The version the camera reported
+
+    Raises:
+        LoginError: As soon as read_version reports rejected credentials
+    """
+    deadline = time.monotonic() + timeout
+    seen = ""
+    while True:
+        seen = read_version() or seen
+        if seen and version_tuple(seen) >= version_tuple(target):
+            return seen
+        if time.monotonic() + interval > deadline:
+            break
+        time.sleep(interval)
+    raise Exception(f"Version not confirmed after {timeout}s (last seen: {seen or 'unreachable'})")
+
+
+def upload_camera(row, image, filename, limiter, username, password):
+    """Upload stage: push the image to one camera with whichever auth it accepts."""
+    ip = row["ip_address"].strip()
+    result = {
+        "ip_address": ip,
+        "hostname": row.get("hostname", "").strip(),
+        "old_version": row.get("firmware_version", "").strip(),
+        "new_version": "",
+        "status": "OK",
+        "error": "",
+    }
+    try:
+        print(f" → {ip}: uploading {filename}")
+        basic = basic_auth_challenge(ip)
+        if basic:
+            headers = camera_auth_headers(username, password)
+        else:
+            # Form or WebUI Next camera: upload through its web session
+            headers = login_session_headers(ip, username, password)
+        try:
+            acknowledged = upload_firmware(ip, image, filename, limiter, headers)
+        except LoginError:
+            if not basic:
+                raise
+            # Basic challenge on the pages but not accepted for uploads
+            headers = login_session_headers(ip, username, password)
+            acknowledged = upload_firmware(ip, image, filename, limiter, headers)
+        if acknowledged:
+            print(f" → {ip}: upload complete, waiting for reboot")
+        else:
+            print(f" → {ip}: upload sent, no reply yet (likely flashing), waiting for reboot")
+    except Exception as e:
+        result["status"] = "Failed"
+        result["error"] = (str(e).splitlines() or [type(e).__name__])[0]
+        print(f"[ERROR] {ip}: {result['error']}")
+    return result
+
+
+def confirm_upgrade(result, target, username, password):
+    """Confirmation stage: wait for the camera to reboot into the target version."""
+    ip = result["ip_address"]
+    try:
+        result["new_version"] = wait_for_version(
+            lambda: poll_firmware_version(ip, username, password), target
+        )
+        print(f" → {ip}: running {result['new_version']}")
+    except Exception as e:
+        result["status"] = "Failed"
+        result["error"] = (str(e).splitlines() or [type(e).__name__])[0]
+        print(f"[ERROR] {ip}: {result['error']}")
+    return result
+
+
+def main():
+    # --- Get credentials from .env ---
+    username, password = get_camera_credentials()
+
+    if not UPLOAD_PATH:
+        print("[ERROR] FIRMWARE_UPLOAD_PATH not set in .env file.")
+        print("Set it to the firmware upload endpoint for your camera model, e.g.:")
+        print("  FIRMWARE_UPLOAD_PATH=/path/to/upload")
+        exit(1)
+    if BANDWIDTH_MBPS <= 0:
+        print(f"[ERROR] FIRMWARE_BANDWIDTH_MBPS must be greater than 0 (got {BANDWIDTH_MBPS}).")
+        exit(1)
+
+    # --- Prompt for school and firmware ---
+    school = input("Select a school number in format - 001, 016 etc.: ").strip()
+    part_number = input("Camera part number to upgrade (e.g., 3.0C-H5A-DO1): ").strip()
+    target_version = input("Target firmware version (e.g., 4.12.0.36): ").strip()
+    firmware_path = input("Path to firmware file: ").strip()
+
+    if not os.path.isfile(firmware_path):
+        print(f"[ERROR] Firmware file not found: {firmware_path}")
+        exit(1)
+
+    # --- File paths ---
+    # Use 'onedrive', 'local', or any custom path
+    base_dir = resolve_inventory_path()
+    csv_path = os.path.join(base_dir, school, "camera_data.csv")
+
+    # camera_data.csv must already carry inventory_cameras.py output
+    validate_csv(csv_path, ["ip_address", "hostname", "part_number", "firmware_version"])
+
+    # --- Select cameras older than the target ---
+    with open(csv_path, newline='', encoding='utf-8-sig') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+
+    targets = [
+        row for row in rows
+        if row["part_number"].strip().lower() == part_number.lower()
+        and version_tuple(row["firmware_version"]) < version_tuple(target_version)
+    ]
+
+    print(f"{len(targets)} of {len(rows)} cameras match {part_number} below {target_version}.")
+    if not targets:
+        exit(0)
+
+    # --- Upload from one shared mapping, confirm in a separate stage ---
+    # Uploads are limited to MAX_WORKERS and the bandwidth cap; cameras
+    # waiting on a reboot move to the confirmation pool (mostly sleeping,
+    # browsers capped by CAMERA_MAX_BROWSERS) so they never hold an upload slot
+    results = []
+    limiter = BandwidthLimiter(BANDWIDTH_MBPS)
+    filename = os.path.basename(firmware_path)
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as confirm_pool:
+        confirms = []
+        with open(firmware_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            image = memoryview(mapped)
+            try:
+                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as upload_pool:
+                    uploads = [
+                        upload_pool.submit(upload_camera, row, image, filename, limiter,
+                                           username, password)
+                        for row in targets
+                    ]
+                    for future in as_completed(uploads):
+                        result = future.result()
+                        if result["status"] == "OK":
+                            confirms.append(confirm_pool.submit(
+                                confirm_upgrade, result, target_version, username, password
+                            ))
+                        else:
+                            results.append(result)
+            finally:
+                image.release()
+
+        for future in as_completed(confirms):
+            results.append(future.result())
+
+    # --- Write results next to the school's inventory ---
+    order = {row["ip_address"].strip(): i for i, row in enumerate(targets)}
+    results.sort(key=lambda r: order[r["ip_address"]])
+
+    output_path = os.path.join(base_dir, school, f"{school}_firmware_upgrade.csv")
+    with open(output_path, "w", newline='') as f:
+        writer = csv.DictWriter(
+            f,
+            fieldnames=["ip_address", "hostname", "old_version", "new_version", "status", "error"],
+            quoting=csv.QUOTE_ALL,
+        )
+        writer.writeheader()
+        writer.writerows(results)
+
+    # --- Print summary ---
+    failed = [r for r in results if r["status"] != "OK"]
+    print("\n" + "="*70)
+    print("SUMMARY")
+    print("="*70)
+    print(f"Total cameras selected: {len(results)}")
+    print(f"Upgraded: {len(results) - len(failed)}")
+    print(f"Failed: {len(failed)}")
+
+    if failed:
+        print("\n=== FAILED CAMERAS ===")
+        print(f"{'IP Address':<15} {'Hostname':<30} {'Error'}")
+        print("-" * 70)
+        for r in failed:
+            print(f"{r['ip_address']:<15} {r['hostname']:<30} {r['error']}")
+
+    print(f"\n✅ Upgrade report: {output_path}")
+
+
+if __name__ == "__main__":
+    main()